@@ -0,0 +1,38 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Iterable, List
+
+class BatchProcessor:
+    """Run batches of coroutines with bounded concurrency and a requests-per-minute limit."""
+
+    def __init__(self, max_concurrency: int = 10, rpm: int = 100):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self._tokens = float(rpm)
+        self._updated = time.monotonic()
+
+    async def run_batch(self, coros: Iterable[Awaitable[Any]]) -> List[Any]:
+        """Await all coroutines, returning results (or raised exceptions) in input order."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        lock = asyncio.Lock()
+
+        async def _wrap(coro: Awaitable[Any]) -> Any:
+            async with semaphore:
+                await self._acquire(lock)
+                return await coro
+
+        return await asyncio.gather(*(_wrap(c) for c in coros), return_exceptions=True)
+
+    async def _acquire(self, lock: asyncio.Lock) -> None:
+        """Wait for a token from the bucket, which refills at rpm tokens per minute."""
+        if self.rpm <= 0:
+            return
+        async with lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rpm, self._tokens + (now - self._updated) * self.rpm / 60)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * 60 / self.rpm)
@@ -1,14 +1,77 @@
+import asyncio
 import os
 import google.generativeai as genai
-from typing import Dict, List, Optional, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
-import json
 import re
+import string
+import time
 
-from core import PlanManager, config, logger
+from core import PlanManager, DiskCache, LRUCache, config, logger
+from core.cache import normalize_prompt, prompt_key
 from research.github_search import GitHubSearcher
 from research.stackoverflow_search import StackOverflowSearcher
 
+# Strips ASCII punctuation but keeps '_', which is a word character in identifiers
+_PUNCT_TRANS = str.maketrans('', '', string.punctuation.replace('_', ''))
+_QUOTED_RE = re.compile(r'"([^"]*)"')
+
+_RESEARCH_KEYWORDS = frozenset({
+    "similar projects", "github repos", "alternatives", "examples",
+    "how to", "best practices", "tutorials", "documentation",
+    "stack overflow", "find", "search", "compare", "like"
+})
+
+_MAX_HISTORY = 200
+_PLAN_BUDGET = 4096  # characters of plan text sent with each prompt
+_RESEARCH_WORKERS = 5
+_RESEARCH_CACHE_SIZE = 64
+_MAX_GITHUB_REPOS = 10
+_MAX_SO_POSTS = 5
+_RESEARCH_CACHE_TTL = 3600  # seconds
+_RESEARCH_STORE_TTL = 86400  # seconds
+
+_STOP_WORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by"})
+
+# Keyword groups that map user input to the next Qwen action, in priority order
+_ACTION_KEYWORDS = (
+    ("code_generation", ("create", "build", "implement", "code", "write", "generate", "develop")),
+    ("file_operations", ("file", "directory", "folder", "save", "write to")),
+    ("cli_operations", ("install", "run", "execute", "command", "terminal", "bash")),
+)
+
+# Static pieces of the Gemini response prompt, joined around context and input
+_PROMPT_HEAD = """You are an intelligent coding assistant. Based on the context below, provide a helpful response to the user.
+
+Context:
+"""
+_PROMPT_INPUT = """
+
+User Input: """
+_PROMPT_TAIL = """
+
+Provide a clear, helpful response that:
+1. Acknowledges what the user is asking for
+2. Incorporates relevant research findings if available
+3. Suggests next steps or actions
+4. Updates the plan if needed
+
+Response:"""
+
+def _iso(timestamp_ns: int) -> str:
+    """Format a history timestamp (ns since epoch) as ISO-8601 for display."""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+def _keyword_matcher(keywords) -> "re.Pattern":
+    """Compile keywords into one alternation so input is scanned in a single pass."""
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+_RESEARCH_RE = _keyword_matcher(_RESEARCH_KEYWORDS)
+_ACTION_RES = tuple((action, _keyword_matcher(keywords)) for action, keywords in _ACTION_KEYWORDS)
+
 class GeminiAgent:
     """Gemini-powered conversational agent with research capabilities."""
     
@@ -23,24 +86,36 @@ class GeminiAgent:
         self.model = genai.GenerativeModel(config.GEMINI_MODEL)
         
         # Conversation memory
-        self.conversation_history = []
-        self.research_cache = {}
+        self.conversation_history = deque(maxlen=_MAX_HISTORY)
+        self.research_cache = LRUCache(_RESEARCH_CACHE_SIZE, ttl=_RESEARCH_CACHE_TTL)
+        self._research_store = DiskCache(
+            os.path.join(config.CACHE_DIR, 'research_cache'), ttl=_RESEARCH_STORE_TTL
+        )
+        self._latest_research: Optional[Dict[str, Any]] = None
+        
+        # Response cache: exact prompt digest first, then normalized prompt
+        self._exact_cache = LRUCache(config.RESPONSE_CACHE_SIZE)
+        self._normalized_cache = LRUCache(config.RESPONSE_CACHE_SIZE)
+        # Exact prompts also persist across sessions, keyed with the model name
+        self._response_store = DiskCache(
+            os.path.join(config.CACHE_DIR, 'gemini_cache'), ttl=config.LLM_CACHE_TTL
+        ) if config.LLM_CACHE else None
         
         logger.info("Gemini Agent initialized successfully")
 
     def process_user_input(self, user_input: str) -> Dict[str, Any]:
         """Process user input and determine next actions."""
-        logger.log_agent_action("GEMINI", "PROCESS_INPUT", f"User: {user_input[:100]}...")
+        logger.log_agent_action("GEMINI", "PROCESS_INPUT", "User: %.100s...", user_input)
         
         # Add to conversation history
         self.conversation_history.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),
             "role": "user",
             "content": user_input
         })
         
-        # Analyze input for research needs
-        research_needed = self._analyze_research_needs(user_input)
+        # Analyze input once for research needs, search terms and next action
+        research_needed, search_terms, next_action = self._analyze_input(user_input)
         
         response = {
             "requires_research": research_needed,
@@ -52,7 +127,7 @@ class GeminiAgent:
         
         # Perform research if needed
         if research_needed:
-            research_results = self._conduct_research(user_input)
+            research_results = self._conduct_research(user_input, search_terms)
             response["research_queries"] = research_results.get("queries", [])
             
             # Update plan with research findings
@@ -62,33 +137,50 @@ class GeminiAgent:
         gemini_response = self._generate_gemini_response(user_input, research_needed)
         response["response_to_user"] = gemini_response
         
-        # Determine next action for Qwen
-        next_action = self._determine_next_action(user_input, gemini_response)
+        # Next action for Qwen depends only on the user input
         response["next_action"] = next_action
         
         # Add assistant response to history
         self.conversation_history.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),
             "role": "assistant",
             "content": gemini_response
         })
         
         return response
 
-    def _analyze_research_needs(self, user_input: str) -> bool:
-        """Analyze if user input requires research."""
-        research_keywords = [
-            "similar projects", "github repos", "alternatives", "examples",
-            "how to", "best practices", "tutorials", "documentation",
-            "stack overflow", "find", "search", "compare", "like"
-        ]
-        
+    async def process_user_input_async(self, user_input: str) -> Dict[str, Any]:
+        """Process user input without blocking the event loop on research or Gemini calls."""
+        return await asyncio.to_thread(self.process_user_input, user_input)
+
+    def _analyze_input(self, user_input: str) -> Tuple[bool, List[str], str]:
+        """Derive research need, search terms and next action from one lowercase pass."""
         user_lower = user_input.lower()
-        return any(keyword in user_lower for keyword in research_keywords)
+        research_needed = self._analyze_research_needs(user_input, user_lower)
+        search_terms = self._extract_search_terms(user_input, user_lower) if research_needed else []
+        next_action = self._determine_next_action(user_input, "", user_lower)
+        return research_needed, search_terms, next_action
 
-    def _conduct_research(self, query: str) -> Dict[str, Any]:
+    def _analyze_research_needs(self, user_input: str, user_lower: Optional[str] = None) -> bool:
+        """Analyze if user input requires research."""
+        if user_lower is None:
+            user_lower = user_input.lower()
+        return _RESEARCH_RE.search(user_lower) is not None
+
+    def _conduct_research(self, query: str, search_terms: Optional[List[str]] = None) -> Dict[str, Any]:
         """Conduct research using GitHub and Stack Overflow."""
-        logger.log_agent_action("GEMINI", "RESEARCH", f"Researching: {query[:50]}...")
+        logger.log_agent_action("GEMINI", "RESEARCH", "Researching: %.50s...", query)
+        
+        # Serve repeat queries from memory, then from the on-disk store
+        cache_key = prompt_key(query)
+        cached = self.research_cache.get(cache_key)
+        if cached is None:
+            cached = self._research_store.get(cache_key)
+            if cached is not None:
+                self.research_cache.set(cache_key, cached)
+        if cached is not None:
+            self._latest_research = cached
+            return cached
         
         research_results = {
             "queries": [],
@@ -97,79 +189,113 @@ class GeminiAgent:
             "summary": ""
         }
         
-        # Extract search terms from query
-        search_terms = self._extract_search_terms(query)
+        # Extract search terms from query unless the caller already did
+        if search_terms is None:
+            search_terms = self._extract_search_terms(query)
         research_results["queries"] = search_terms
         
-        # Search GitHub
-        for term in search_terms[:3]:  # Limit to top 3 terms
-            try:
-                github_results = self.github_searcher.search_repositories(term)
-                research_results["github_repos"].extend(github_results[:5])  # Top 5 per term
-            except Exception as e:
-                logger.error(f"GitHub search failed for '{term}': {e}")
-        
-        # Search Stack Overflow
-        for term in search_terms[:2]:  # Limit to top 2 terms
-            try:
-                so_results = self.so_searcher.search_questions(term)
-                research_results["stackoverflow_posts"].extend(so_results[:3])  # Top 3 per term
-            except Exception as e:
-                logger.error(f"Stack Overflow search failed for '{term}': {e}")
+        # Run GitHub (top 3 terms) and Stack Overflow (top 2 terms) searches concurrently
+        with ThreadPoolExecutor(max_workers=_RESEARCH_WORKERS) as executor:
+            github_futures = [
+                (term, executor.submit(self.github_searcher.search_repositories, term, raise_errors=True))
+                for term in search_terms[:3]
+            ]
+            so_futures = [
+                (term, executor.submit(self.so_searcher.search_questions, term, raise_errors=True))
+                for term in search_terms[:2]
+            ]
+            
+            github_complete = self._collect_unique(github_futures, research_results["github_repos"], 5, _MAX_GITHUB_REPOS, "GitHub")
+            so_complete = self._collect_unique(so_futures, research_results["stackoverflow_posts"], 3, _MAX_SO_POSTS, "Stack Overflow")
         
         # Generate research summary
         research_results["summary"] = self._summarize_research(research_results)
         
-        # Cache results
-        cache_key = hash(query)
-        self.research_cache[cache_key] = research_results
+        # Cache results only when every search succeeded and found something,
+        # so a rate limit or outage is retried instead of served for a day
+        if github_complete and so_complete and (research_results["github_repos"] or research_results["stackoverflow_posts"]):
+            self.research_cache.set(cache_key, research_results)
+            self._research_store.set(cache_key, research_results)
+        self._latest_research = research_results
         
         return research_results
 
-    def _extract_search_terms(self, query: str) -> List[str]:
+    def _collect_unique(self, futures: List, results: List[Dict], per_term: int, limit: int, source: str) -> bool:
+        """Gather search results in term order, skipping duplicates and stopping at limit.
+        
+        Returns False if any search that was needed failed.
+        """
+        seen = set()
+        complete = True
+        for term, future in futures:
+            if len(results) >= limit:
+                future.cancel()
+                continue
+            try:
+                items = future.result()[:per_term]
+            except Exception as e:
+                logger.error(f"{source} search failed for '{term}': {e}")
+                complete = False
+                continue
+            for item in items:
+                key = item.get("url") or item.get("name") or item.get("title")
+                if key in seen:
+                    continue
+                seen.add(key)
+                results.append(item)
+                if len(results) >= limit:
+                    break
+        return complete
+
+    def _extract_search_terms(self, query: str, query_lower: Optional[str] = None) -> List[str]:
         """Extract relevant search terms from user query."""
-        # Remove common words and extract key terms
-        stop_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by"}
-        
-        # Clean and tokenize
-        clean_query = re.sub(r'[^\w\s]', '', query.lower())
-        words = [word for word in clean_query.split() if word not in stop_words and len(word) > 2]
-        
-        # Extract phrases and important terms
-        search_terms = []
-        
-        # Look for quoted phrases
-        quoted_phrases = re.findall(r'"([^"]*)"', query)
-        search_terms.extend(quoted_phrases)
-        
-        # Add important individual words
-        important_words = [word for word in words if len(word) > 4]
-        search_terms.extend(important_words[:3])
+        if query_lower is None:
+            query_lower = query.lower()
+        
+        # Quoted phrases come first, then important words, then the leading word pair
+        search_terms = _QUOTED_RE.findall(query)
+        leading_words = []
+        important_count = 0
+        
+        # Single pass over tokens, dropping punctuation and common words
+        for word in query_lower.translate(_PUNCT_TRANS).split():
+            if word in _STOP_WORDS or len(word) <= 2:
+                continue
+            if len(leading_words) < 2:
+                leading_words.append(word)
+            if important_count < 3 and len(word) > 4:
+                search_terms.append(word)
+                important_count += 1
+            if important_count == 3 and len(leading_words) == 2:
+                break
         
         # Add combined terms
-        if len(words) >= 2:
-            search_terms.append(" ".join(words[:2]))
+        if len(leading_words) == 2:
+            search_terms.append(" ".join(leading_words))
         
-        return list(set(search_terms))  # Remove duplicates
+        # Remove duplicates, keeping the user's ordering
+        return list(dict.fromkeys(search_terms))
 
     def _summarize_research(self, research_results: Dict[str, Any]) -> str:
         """Generate a summary of research findings."""
         github_count = len(research_results["github_repos"])
         so_count = len(research_results["stackoverflow_posts"])
         
-        summary = f"Research Summary:\n"
-        summary += f"- Found {github_count} relevant GitHub repositories\n"
-        summary += f"- Found {so_count} relevant Stack Overflow discussions\n"
+        parts = [
+            "Research Summary:\n",
+            f"- Found {github_count} relevant GitHub repositories\n",
+            f"- Found {so_count} relevant Stack Overflow discussions\n"
+        ]
         
         if github_count > 0:
             top_repo = research_results["github_repos"][0]
-            summary += f"- Top repository: {top_repo['name']} ({top_repo['stars']} stars)\n"
+            parts.append(f"- Top repository: {top_repo['name']} ({top_repo['stars']} stars)\n")
         
         if so_count > 0:
             top_post = research_results["stackoverflow_posts"][0]
-            summary += f"- Top Stack Overflow post: {top_post['title']}\n"
+            parts.append(f"- Top Stack Overflow post: {top_post['title']}\n")
         
-        return summary
+        return "".join(parts)
 
     def _generate_gemini_response(self, user_input: str, has_research: bool) -> str:
         """Generate response using Gemini API."""
@@ -177,67 +303,82 @@ class GeminiAgent:
             # Build context
             context = self._build_context(user_input, has_research)
             
-            prompt = f"""You are an intelligent coding assistant. Based on the context below, provide a helpful response to the user.
-
-Context:
-{context}
-
-User Input: {user_input}
-
-Provide a clear, helpful response that:
-1. Acknowledges what the user is asking for
-2. Incorporates relevant research findings if available
-3. Suggests next steps or actions
-4. Updates the plan if needed
-
-Response:"""
+            prompt = "".join((_PROMPT_HEAD, context, _PROMPT_INPUT, user_input, _PROMPT_TAIL))
+            
+            cached = self._get_cached_response(prompt)
+            if cached is not None:
+                logger.debug("Gemini response served from cache")
+                return cached
             
             response = self.model.generate_content(prompt)
+            self._cache_response(prompt, response.text)
             return response.text
             
         except Exception as e:
             logger.error(f"Gemini API call failed: {e}")
             return f"I encountered an issue generating a response. Error: {str(e)}"
 
+    def _get_cached_response(self, prompt: str) -> Optional[str]:
+        """Look up a previous response for an identical or reworded prompt."""
+        cached = self._exact_cache.get(prompt_key(prompt))
+        if cached is None:
+            cached = self._normalized_cache.get(prompt_key(normalize_prompt(prompt)))
+        if cached is None and self._response_store is not None:
+            cached = self._response_store.get(self._store_key(prompt))
+            if cached is not None:
+                self._exact_cache.set(prompt_key(prompt), cached)
+        return cached
+
+    def _cache_response(self, prompt: str, text: str) -> None:
+        """Store a response under both the exact and normalized prompt keys."""
+        self._exact_cache.set(prompt_key(prompt), text)
+        self._normalized_cache.set(prompt_key(normalize_prompt(prompt)), text)
+        if self._response_store is not None:
+            self._response_store.set(self._store_key(prompt), text)
+
+    def _store_key(self, prompt: str) -> bytes:
+        """Persistent cache key: the same prompt to a different model is a miss."""
+        return prompt_key(f"{config.GEMINI_MODEL}\n{prompt}")
+
     def _build_context(self, user_input: str, has_research: bool) -> str:
         """Build context for Gemini including plan and research."""
-        context = f"Current Plan:\n{self.plan_manager.get_plan()}\n\n"
+        plan = self.plan_manager.get_plan()
+        if len(plan) > _PLAN_BUDGET:
+            half = _PLAN_BUDGET // 2
+            plan = f"{plan[:half]}\n...\n{plan[-half:]}"
+        parts = [f"Current Plan:\n{plan}\n\n"]
         
-        if has_research and self.research_cache:
-            latest_research = list(self.research_cache.values())[-1]
-            context += f"Recent Research Findings:\n{latest_research['summary']}\n\n"
+        if has_research and self._latest_research:
+            parts.append(f"Recent Research Findings:\n{self._latest_research['summary']}\n\n")
         
-        # Add recent conversation history
+        # Add as much recent conversation as fits the budget, newest first
         if len(self.conversation_history) > 0:
-            context += "Recent Conversation:\n"
-            for msg in self.conversation_history[-4:]:  # Last 4 messages
-                role = msg["role"].title()
-                content = msg["content"][:200]  # Truncate for context
-                context += f"{role}: {content}\n"
-        
-        return context
+            budget = config.MAX_CONTEXT_LENGTH
+            recent = []
+            for msg in reversed(self.conversation_history):
+                entry = f"{msg['role'].title()}: {msg['content']}\n"
+                if len(entry) > budget:
+                    # The newest entry is always sent, cut down to the budget if need be
+                    if not recent and budget > 4:
+                        recent.append(entry[:budget - 4] + "...\n")
+                    break
+                recent.append(entry)
+                budget -= len(entry)
+            if recent:
+                parts.append("Recent Conversation:\n")
+                parts.extend(reversed(recent))
+        
+        return "".join(parts)
 
-    def _determine_next_action(self, user_input: str, response: str) -> str:
+    def _determine_next_action(self, user_input: str, response: str, user_lower: Optional[str] = None) -> str:
         """Determine what action Qwen should take next."""
-        # Keywords that suggest code generation
-        code_keywords = ["create", "build", "implement", "code", "write", "generate", "develop"]
-        
-        # Keywords that suggest file operations
-        file_keywords = ["file", "directory", "folder", "save", "write to"]
+        if user_lower is None:
+            user_lower = user_input.lower()
         
-        # Keywords that suggest CLI operations
-        cli_keywords = ["install", "run", "execute", "command", "terminal", "bash"]
-        
-        user_lower = user_input.lower()
-        
-        if any(keyword in user_lower for keyword in code_keywords):
-            return "code_generation"
-        elif any(keyword in user_lower for keyword in file_keywords):
-            return "file_operations"
-        elif any(keyword in user_lower for keyword in cli_keywords):
-            return "cli_operations"
-        else:
-            return "conversation_only"
+        for action, matcher in _ACTION_RES:
+            if matcher.search(user_lower):
+                return action
+        return "conversation_only"
 
     def _update_plan_with_research(self, research_results: Dict[str, Any]) -> None:
         """Update plan file with research findings."""
@@ -257,9 +398,18 @@ Response:"""
 
     def get_conversation_context(self) -> List[Dict]:
         """Get conversation history for context."""
-        return self.conversation_history[-10:]  # Last 10 messages
+        return [
+            {**msg, "timestamp": _iso(msg["timestamp"])}
+            for msg in self._recent_messages(10)
+        ]
+
+    def _recent_messages(self, count: int) -> List[Dict]:
+        """Return the last `count` messages without copying the whole history."""
+        recent = list(islice(reversed(self.conversation_history), count))
+        recent.reverse()
+        return recent
 
     def clear_conversation_history(self) -> None:
         """Clear conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
         logger.info("Conversation history cleared")
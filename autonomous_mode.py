@@ -4,16 +4,104 @@ Autonomous Mode for Autocoder
 Runs projects without human intervention - fully automated.
 """
 
+import asyncio
 import os
 import sys
 import time
 import json
+import uuid
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib encoder is the fallback
+    orjson = None
 
 from agents.gemini_agent import GeminiAgent
 from agents.qwen_agent import QwenAgent
-from core import config, logger
+from agents.batch import BatchProcessor
+from core import SimilarityCache, config, logger
+
+# Project name patterns, tried in order against the lowercased request
+_NAME_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'create\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
+    r'build\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
+    r'make\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
+    r'generate\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
+    r'(\w+)\s+(?:project|app|program|script|tool)',
+    r'(\w+)\s+(?:manager|calculator|scraper|generator)'
+))
+# Matches too generic to use as a project name
+_GENERIC_NAMES = frozenset(('python', 'javascript', 'web', 'app', 'program'))
+# Words after which the rest of a request is taken as its description
+_DESCRIPTION_MARKERS = frozenset(('for', 'that', 'which', 'to', 'with'))
+
+# Characters of command output kept per stream in execution records
+_RECORDED_OUTPUT_CHARS = 4096
+# Recent projects and execution results kept in memory; the full history goes to the runs file
+_HISTORY_LIMIT = 1000
+
+# (keywords, (project_type, language)) in priority order; keywords match as substrings
+_PROJECT_TYPE_KEYWORDS = (
+    (('react', 'jsx', 'component', 'frontend'), ('react', 'javascript')),
+    (('fastapi', 'api', 'rest', 'backend', 'server'), ('fastapi', 'python')),
+    (('javascript', 'node', 'js', 'express'), ('javascript', 'javascript')),
+    (('python', 'py', 'django', 'flask', 'script'), ('python', 'python')),
+)
+# One alternation per type, so each is a single scan of the request
+_PROJECT_TYPE_RES = tuple(
+    (re.compile("|".join(map(re.escape, keywords))), detected)
+    for keywords, detected in _PROJECT_TYPE_KEYWORDS
+)
+
+def _dump_json(data: Any, indent: bool = False) -> bytes:
+    """Encode data as UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+@lru_cache(maxsize=1024)
+def _detect_project_type(request: str) -> tuple:
+    """Project type and language for a request, by keyword priority."""
+    request_lower = request.lower()
+    for pattern, detected in _PROJECT_TYPE_RES:
+        if pattern.search(request_lower):
+            return detected
+    return 'python', 'python'  # Default
+
+@lru_cache(maxsize=1024)
+def _match_project_name(request: str) -> Optional[str]:
+    """Project name named in a request, or None if no pattern yields a specific one."""
+    request_lower = request.lower()
+    for pattern in _NAME_PATTERNS:
+        match = pattern.search(request_lower)
+        if match:
+            name = match.group(1)
+            if name not in _GENERIC_NAMES:
+                return name
+    return None
+
+@lru_cache(maxsize=1024)
+def _extract_description(request: str) -> str:
+    """Words after the first connective ('for', 'that', ...), else all but the first two."""
+    words = request.split()
+    description_words = []
+    
+    for i, word in enumerate(words):
+        if word.lower() in _DESCRIPTION_MARKERS:
+            description_words = words[i+1:]
+            break
+    
+    if not description_words:
+        description_words = words[2:]  # Skip first two words
+    
+    return ' '.join(description_words) if description_words else 'Autonomous project'
 
 class AutonomousAutocoder:
     """Fully autonomous autocoder that creates and executes projects without human intervention."""
@@ -22,18 +110,31 @@ class AutonomousAutocoder:
         """Initialize autonomous autocoder."""
         self.gemini = GeminiAgent('autonomous_plan.txt')
         self.qwen = QwenAgent()
-        self.projects_created = []
-        self.execution_results = []
+        self.projects_created = deque(maxlen=_HISTORY_LIMIT)
+        self.execution_results = deque(maxlen=_HISTORY_LIMIT)
+        self.runs_file = os.path.join(config.CACHE_DIR, 'autonomous_runs.jsonl')
+        self._counts = {"projects": 0, "succeeded": 0, "failed": 0}
+        self._history_lock = threading.Lock()
+        self._request_cache = SimilarityCache(config.RESPONSE_CACHE_SIZE, config.SEMANTIC_CACHE_THRESHOLD) if config.REQUEST_CACHE else None
+        self._analysis_pool = ThreadPoolExecutor(max_workers=1)
         
         logger.info("Autonomous Autocoder initialized")
     
     def process_request(self, request: str) -> Dict[str, Any]:
         """Process a request and create/execute project autonomously."""
         logger.info(f"Processing autonomous request: {request}")
+        started_at = datetime.now().isoformat()
+        
+        if self._request_cache is not None:
+            cached = self._request_cache.get(request)
+            if cached is not None and os.path.isdir(cached['project_path']):
+                logger.info(f"Reusing project {cached['project_name']} for similar request")
+                return {**cached, "cached": True}
         
         try:
-            # Step 1: Gemini analyzes the request
-            gemini_response = self.gemini.process_user_input(request)
+            # Step 1: Gemini analyzes the request; project creation below does not
+            # depend on the analysis, so it runs alongside on a worker thread
+            analysis = self._analysis_pool.submit(self.gemini.process_user_input, request)
             
             # Step 2: Determine project details
             project_type, language = self._detect_project_type(request)
@@ -56,13 +157,14 @@ class AutonomousAutocoder:
                 }
             
             # Step 4: Record project creation
-            self.projects_created.append({
+            project_record = {
                 "name": project_name,
                 "type": project_type,
                 "path": project_result['project_path'],
                 "files": project_result['created_files'],
-                "timestamp": datetime.now().isoformat()
-            })
+                "timestamp": started_at
+            }
+            execution_record = None
             
             # Step 5: Handle dependencies and execution
             execution_info = {}
@@ -76,27 +178,32 @@ class AutonomousAutocoder:
                 }
             
             if 'execution' in project_result:
-                exec_result = project_result['execution']
+                # Keep the start of stdout and the end of stderr, where tracebacks finish
+                exec_result = dict(project_result['execution'])
+                exec_result['stdout'] = (exec_result.get('stdout') or '')[:_RECORDED_OUTPUT_CHARS]
+                exec_result['stderr'] = (exec_result.get('stderr') or '')[-_RECORDED_OUTPUT_CHARS:]
                 execution_info['execution'] = {
                     "success": exec_result['success'],
                     "command": exec_result.get('command', ''),
-                    "stdout": exec_result.get('stdout', ''),
-                    "stderr": exec_result.get('stderr', ''),
+                    "stdout": exec_result['stdout'],
+                    "stderr": exec_result['stderr'],
                     "return_code": exec_result.get('return_code', 0)
                 }
                 
                 # Record execution result
-                self.execution_results.append({
+                execution_record = {
                     "project": project_name,
                     "success": exec_result['success'],
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": started_at,
                     "details": exec_result
-                })
+                }
+            
+            self._record_run(project_record, execution_record)
             
             # Step 6: Generate summary
             summary = self._generate_summary(project_result, execution_info)
             
-            return {
+            result = {
                 "success": True,
                 "project_name": project_name,
                 "project_type": project_type,
@@ -104,8 +211,11 @@ class AutonomousAutocoder:
                 "created_files": project_result['created_files'],
                 "execution_info": execution_info,
                 "summary": summary,
-                "gemini_analysis": gemini_response['response_to_user']
+                "gemini_analysis": analysis.result()['response_to_user']
             }
+            if self._request_cache is not None:
+                self._request_cache.set(request, result)
+            return result
             
         except Exception as e:
             logger.error(f"Autonomous processing failed: {e}")
@@ -115,102 +225,103 @@ class AutonomousAutocoder:
                 "request": request
             }
     
+    async def aprocess_request(self, request: str) -> Dict[str, Any]:
+        """Process a request without blocking the event loop."""
+        return await asyncio.to_thread(self.process_request, request)
+    
+    async def aprocess_batch(self, requests: List[str], concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process several requests concurrently, returning results in input order."""
+        processor = BatchProcessor(concurrency or config.MAX_CONCURRENT_REQUESTS, config.API_RATE_LIMIT_RPM)
+        
+        # Identical requests map to the same project directory, so each runs once
+        unique = list(dict.fromkeys(requests))
+        results = await processor.run_batch(self.aprocess_request(request) for request in unique)
+        by_request = {
+            request: result if isinstance(result, dict) else {"success": False, "error": str(result), "request": request}
+            for request, result in zip(unique, results)
+        }
+        return [by_request[request] for request in requests]
+    
+    def process_batch(self, requests: List[str], concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Synchronous entry point for aprocess_batch."""
+        return asyncio.run(self.aprocess_batch(requests, concurrency))
+    
     def _detect_project_type(self, request: str) -> tuple:
         """Detect project type and language from request."""
-        request_lower = request.lower()
-        
-        if any(word in request_lower for word in ['react', 'jsx', 'component', 'frontend']):
-            return 'react', 'javascript'
-        elif any(word in request_lower for word in ['fastapi', 'api', 'rest', 'backend', 'server']):
-            return 'fastapi', 'python'
-        elif any(word in request_lower for word in ['javascript', 'node', 'js', 'express']):
-            return 'javascript', 'javascript'
-        elif any(word in request_lower for word in ['python', 'py', 'django', 'flask', 'script']):
-            return 'python', 'python'
-        else:
-            return 'python', 'python'  # Default
+        return _detect_project_type(request)
     
     def _extract_project_name(self, request: str) -> str:
         """Extract project name from request."""
-        import re
-        import time
-        
-        patterns = [
-            r'create\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
-            r'build\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
-            r'make\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
-            r'generate\s+(?:a\s+)?(?:project\s+)?(?:called\s+)?(\w+)',
-            r'(\w+)\s+(?:project|app|program|script|tool)',
-            r'(\w+)\s+(?:manager|calculator|scraper|generator)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, request.lower())
-            if match:
-                name = match.group(1)
-                if name not in ['python', 'javascript', 'web', 'app', 'program']:
-                    return name
-        
-        # Fallback: use timestamp-based name
-        return f"project_{int(time.time())}"
+        # Fallback: timestamp-based name with a random suffix, unique across concurrent requests
+        return _match_project_name(request) or f"project_{int(time.time())}_{uuid.uuid4().hex[:8]}"
     
     def _extract_description(self, request: str) -> str:
         """Extract project description from request."""
-        words = request.split()
-        description_words = []
-        
-        for i, word in enumerate(words):
-            if word.lower() in ['for', 'that', 'which', 'to', 'with']:
-                description_words = words[i+1:]
-                break
-        
-        if not description_words:
-            description_words = words[2:]  # Skip first two words
-        
-        return ' '.join(description_words) if description_words else 'Autonomous project'
+        return _extract_description(request)
+    
+    def _record_run(self, project: Dict[str, Any], execution: Optional[Dict[str, Any]]) -> None:
+        """Add a run to the recent history and append it to the runs file."""
+        line = _dump_json({"project": project, "execution": execution}) + b"\n"
+        with self._history_lock:
+            self.projects_created.append(project)
+            self._counts["projects"] += 1
+            if execution is not None:
+                self.execution_results.append(execution)
+                self._counts["succeeded" if execution['success'] else "failed"] += 1
+            try:
+                os.makedirs(os.path.dirname(self.runs_file), exist_ok=True)
+                with open(self.runs_file, 'ab') as f:
+                    f.write(line)
+            except OSError as e:
+                logger.warning(f"Could not append to {self.runs_file}: {e}")
     
     def _generate_summary(self, project_result: Dict, execution_info: Dict) -> str:
         """Generate a summary of the autonomous execution."""
-        summary = f"✅ Project created successfully!\n"
-        summary += f"📁 Project: {project_result['project_path']}\n"
-        summary += f"📄 Files created: {len(project_result['created_files'])}\n"
+        parts = [
+            "✅ Project created successfully!\n",
+            f"📁 Project: {project_result['project_path']}\n",
+            f"📄 Files created: {len(project_result['created_files'])}\n"
+        ]
         
         if 'dependencies' in execution_info:
             dep_info = execution_info['dependencies']
             if dep_info['success']:
-                summary += f"📦 Dependencies: Installed successfully\n"
+                parts.append("📦 Dependencies: Installed successfully\n")
             else:
-                summary += f"⚠️  Dependencies: {dep_info['message']}\n"
+                parts.append(f"⚠️  Dependencies: {dep_info['message']}\n")
         
         if 'execution' in execution_info:
             exec_info = execution_info['execution']
             if exec_info['success']:
-                summary += f"🚀 Execution: Successful\n"
+                parts.append("🚀 Execution: Successful\n")
                 if exec_info['stdout']:
-                    summary += f"📤 Output: {exec_info['stdout'][:200]}...\n"
+                    parts.append(f"📤 Output: {exec_info['stdout'][:200]}...\n")
             else:
-                summary += f"❌ Execution: Failed - {exec_info.get('stderr', 'Unknown error')}\n"
+                parts.append(f"❌ Execution: Failed - {exec_info.get('stderr', 'Unknown error')}\n")
         
-        return summary
+        return "".join(parts)
     
     def get_status(self) -> Dict[str, Any]:
         """Get current status of autonomous operations."""
-        return {
-            "projects_created": len(self.projects_created),
-            "successful_executions": len([r for r in self.execution_results if r['success']]),
-            "failed_executions": len([r for r in self.execution_results if not r['success']]),
-            "projects": self.projects_created,
-            "execution_results": self.execution_results
-        }
+        with self._history_lock:
+            return {
+                "projects_created": self._counts["projects"],
+                "successful_executions": self._counts["succeeded"],
+                "failed_executions": self._counts["failed"],
+                "projects": list(self.projects_created),
+                "execution_results": list(self.execution_results),
+                "history_file": self.runs_file
+            }
     
     def save_report(self, filename: str = None) -> str:
         """Save a detailed report of all operations."""
+        now = datetime.now()
         if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = now.strftime('%Y%m%d_%H%M%S')
             filename = f"autonomous_report_{timestamp}.json"
         
         report = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "status": self.get_status(),
             "config": {
                 "autonomous_mode": config.AUTONOMOUS_MODE,
@@ -220,8 +331,8 @@ class AutonomousAutocoder:
             }
         }
         
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(_dump_json(report, indent=True))
         
         logger.info(f"Autonomous report saved to {filename}")
         return filename
@@ -250,12 +361,13 @@ def main():
     print(f"🚀 Processing {len(example_requests)} example requests...")
     print()
     
-    for i, request in enumerate(example_requests, 1):
+    # Requests are independent, so run them concurrently and report in order
+    results = autocoder.process_batch(example_requests, concurrency=4)
+    
+    for i, (request, result) in enumerate(zip(example_requests, results), 1):
         print(f"📋 Request {i}: {request}")
         print("-" * 40)
         
-        result = autocoder.process_request(request)
-        
         if result['success']:
             print(f"✅ Success: {result['project_name']}")
             print(f"📁 Location: {result['project_path']}")
@@ -275,7 +387,6 @@ def main():
             print(f"❌ Failed: {result.get('error', 'Unknown error')}")
         
         print()
-        time.sleep(1)  # Brief pause between requests
     
     # Generate final report
     print("📊 Generating final report...")
@@ -1,11 +1,12 @@
 """
 Core module for Autocoder project.
-Provides plan management, configuration, and logging functionality.
+Provides plan management, configuration, logging, and caching functionality.
 """
 
 from .plan_manager import PlanManager
 from .config import config, Config
 from .logger import logger, AutocoderLogger
+from .cache import LRUCache, DiskCache, SimilarityCache
 
-__all__ = ['PlanManager', 'config', 'Config', 'logger', 'AutocoderLogger']
+__all__ = ['PlanManager', 'config', 'Config', 'logger', 'AutocoderLogger', 'LRUCache', 'DiskCache', 'SimilarityCache']
 __version__ = '0.1.0'
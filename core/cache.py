@@ -0,0 +1,168 @@
+import hashlib
+import os
+import re
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Optional
+
+from .logger import logger
+
+_MISSING = object()
+# One lock per shelve file, shared by every DiskCache instance on that path
+_PATH_LOCKS: Dict[str, threading.Lock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+# Default entry limit for a DiskCache; past it the oldest entries are evicted
+_DISK_CACHE_MAX_ENTRIES = 1024
+_WORD_RE = re.compile(r"\w+")
+_FILLER_WORDS = frozenset({'a', 'an', 'the', 'please', 'me', 'for', 'to', 'of', 'that', 'which', 'some'})
+
+class LRUCache:
+    """Bounded in-memory cache with least-recently-used eviction and optional TTL."""
+
+    def __init__(self, max_size: int = 128, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value and mark it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value, evicting the oldest entries past max_size."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class DiskCache:
+    """Persistent key/value cache backed by shelve, with optional TTL and an entry limit."""
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: int = _DISK_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        with _PATH_LOCKS_GUARD:
+            self._lock = _PATH_LOCKS.setdefault(os.path.abspath(path), threading.Lock())
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Drop entries that expired since the store was last used
+        try:
+            with self._lock, shelve.open(self.path) as db:
+                self._prune(db)
+        except Exception as e:
+            logger.warning(f"Disk cache cleanup of {self.path} failed: {e}")
+
+    def get(self, key: bytes, default: Any = None) -> Any:
+        """Return a stored value, or default if missing or expired."""
+        db_key = key.hex()
+        try:
+            with self._lock, shelve.open(self.path) as db:
+                entry = db.get(db_key)
+                if entry is None:
+                    return default
+                stored_at, value = entry
+                if self.ttl is not None and time.time() - stored_at > self.ttl:
+                    del db[db_key]
+                    return default
+                return value
+        except Exception as e:
+            logger.warning(f"Disk cache read from {self.path} failed: {e}")
+            return default
+
+    def set(self, key: bytes, value: Any) -> None:
+        """Persist value under key, pruning the store once it grows past max_entries."""
+        try:
+            with self._lock, shelve.open(self.path) as db:
+                db[key.hex()] = (time.time(), value)
+                if len(db) > self.max_entries:
+                    self._prune(db)
+        except Exception as e:
+            logger.warning(f"Disk cache write to {self.path} failed: {e}")
+
+    def _prune(self, db: shelve.Shelf) -> None:
+        """Delete expired entries, then the oldest ones down to three quarters of max_entries."""
+        now = time.time()
+        entries = sorted((db[db_key][0], db_key) for db_key in list(db.keys()))
+        # Evicting well below the limit keeps a full store from rescanning on every write
+        excess = len(entries) - self.max_entries * 3 // 4 if len(entries) > self.max_entries else 0
+        for index, (stored_at, db_key) in enumerate(entries):
+            if index < excess or (self.ttl is not None and now - stored_at > self.ttl):
+                del db[db_key]
+
+class SimilarityCache:
+    """Bounded cache that also answers near-duplicate texts by word-set Jaccard similarity."""
+
+    def __init__(self, max_size: int = 256, threshold: float = 0.9):
+        self.max_size = max_size
+        self.threshold = threshold
+        self._data: "OrderedDict[FrozenSet[str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str, default: Any = None) -> Any:
+        """Return the value stored for the most similar text at or above the threshold."""
+        words = _content_words(text)
+        if not words:
+            return default
+        with self._lock:
+            if words in self._data:
+                self._data.move_to_end(words)
+                return self._data[words]
+            best_key, best_score = None, self.threshold
+            for key in self._data:
+                score = len(words & key) / len(words | key)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return default
+            self._data.move_to_end(best_key)
+            return self._data[best_key]
+
+    def set(self, text: str, value: Any) -> None:
+        """Store value for text, evicting the least recently used entries past max_size."""
+        words = _content_words(text)
+        if not words:
+            return
+        with self._lock:
+            self._data[words] = value
+            self._data.move_to_end(words)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+def _content_words(text: str) -> FrozenSet[str]:
+    """Lowercased word set of text without filler words."""
+    return frozenset(_WORD_RE.findall(text.lower())) - _FILLER_WORDS
+
+def prompt_key(text: str) -> bytes:
+    """Stable digest used as a cache key for prompt text."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def normalize_prompt(text: str) -> str:
+    """Collapse case and whitespace so trivially reworded prompts share a key."""
+    return " ".join(text.lower().split())
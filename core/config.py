@@ -8,6 +8,17 @@ load_dotenv()
 class Config:
     """Configuration management for the autocoder project."""
     
+    # Settings are fixed attributes, so instances need no per-object __dict__
+    __slots__ = (
+        'GEMINI_API_KEY', 'FIREWORKS_API_KEY', 'GITHUB_API_TOKEN', 'OPENAI_API_KEY',
+        'PROJECT_ROOT', 'PLAN_FILE', 'LOG_LEVEL', 'CACHE_DIR', 'GEMINI_MODEL', 'QWEN_MODEL',
+        'FIREWORKS_BASE_URL', 'MAX_CONTEXT_LENGTH', 'MAX_CONCURRENT_REQUESTS',
+        'API_RATE_LIMIT_RPM', 'RESPONSE_CACHE_SIZE', 'LLM_CACHE', 'LLM_CACHE_TTL',
+        'SEMANTIC_CACHE_THRESHOLD', 'SIMILAR_CODE_CACHE', 'REQUEST_CACHE', 'REQUIRE_APPROVAL', 'AUTO_SAVE_INTERVAL', 'MAX_FILE_SIZE',
+        'AUTONOMOUS_MODE', 'AUTO_INSTALL_DEPS', 'AUTO_EXECUTE_PROJECTS', 'MAX_EXECUTION_TIME',
+        '_validation'
+    )
+    
     def __init__(self):
         # API Keys
         self.GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
@@ -19,12 +30,23 @@ class Config:
         self.PROJECT_ROOT = os.getcwd()
         self.PLAN_FILE = 'planfile.txt'
         self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+        self.CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(os.path.expanduser('~'), '.autocoder'))
         
         # Agent Settings
         self.GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash-exp')
         self.QWEN_MODEL = os.getenv('QWEN_MODEL', 'accounts/fireworks/models/qwen3-coder-480b-a35b-instruct')
         self.FIREWORKS_BASE_URL = 'https://api.fireworks.ai/inference/v1'
         self.MAX_CONTEXT_LENGTH = 8192  # Increased for better context
+        self.MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '10'))
+        self.API_RATE_LIMIT_RPM = int(os.getenv('API_RATE_LIMIT_RPM', '100'))
+        self.RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '128'))
+        self.LLM_CACHE = os.getenv('LLM_CACHE', 'true').lower() == 'true'
+        self.LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(7 * 86400)))  # seconds
+        self.SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.9'))
+        # Reuse generated code for reworded requests; word-set matching ignores word order and negation
+        self.SIMILAR_CODE_CACHE = os.getenv('SIMILAR_CODE_CACHE', 'false').lower() == 'true'
+        # Answer near-duplicate autonomous requests with the project already built for them
+        self.REQUEST_CACHE = os.getenv('REQUEST_CACHE', 'false').lower() == 'true'
         
         # Safety Settings
         self.REQUIRE_APPROVAL = os.getenv('REQUIRE_APPROVAL', 'false').lower() == 'true'
@@ -37,28 +59,29 @@ class Config:
         self.AUTO_EXECUTE_PROJECTS = os.getenv('AUTO_EXECUTE_PROJECTS', 'true').lower() == 'true'
         self.MAX_EXECUTION_TIME = int(os.getenv('MAX_EXECUTION_TIME', '300'))  # 5 minutes
         
+        # validate_config result, computed on first use
+        self._validation: Optional[Dict[str, bool]] = None
+        
     # ... rest of the Config class remains the same
 
         
-    def validate_config(self) -> Dict[str, bool]:
-        """Validate configuration settings."""
-        validation_results = {
-            'gemini_key_present': bool(self.GEMINI_API_KEY),
-            'fireworks_key_present': bool(self.FIREWORKS_API_KEY),
-            'github_token_present': bool(self.GITHUB_API_TOKEN),
-            'project_root_exists': os.path.exists(self.PROJECT_ROOT),
-            'plan_file_writable': self._check_file_writable(self.PLAN_FILE)
-        }
-        return validation_results
+    def validate_config(self, refresh: bool = False) -> Dict[str, bool]:
+        """Validate configuration settings, reusing the first result unless refresh is set."""
+        if self._validation is None or refresh:
+            self._validation = {
+                'gemini_key_present': bool(self.GEMINI_API_KEY),
+                'fireworks_key_present': bool(self.FIREWORKS_API_KEY),
+                'github_token_present': bool(self.GITHUB_API_TOKEN),
+                'project_root_exists': os.path.exists(self.PROJECT_ROOT),
+                'plan_file_writable': self._check_file_writable(self.PLAN_FILE)
+            }
+        return dict(self._validation)
     
     def _check_file_writable(self, filepath: str) -> bool:
-        """Check if file is writable."""
-        try:
-            with open(filepath, 'a'):
-                pass
-            return True
-        except (IOError, OSError):
-            return False
+        """Check if file is writable, or could be created, without touching it."""
+        if os.path.lexists(filepath):
+            return os.access(filepath, os.W_OK)
+        return os.access(os.path.dirname(os.path.abspath(filepath)), os.W_OK)
     
     def get_config_summary(self) -> str:
         """Get a summary of current configuration."""
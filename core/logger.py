@@ -1,15 +1,25 @@
 import logging
+import logging.handlers
 import os
 from datetime import datetime
 from typing import Optional
 
+# File records buffered before a write; ERROR and above flush immediately
+_FILE_BUFFER_RECORDS = 100
+
 class AutocoderLogger:
     """Custom logger for the autocoder project."""
     
+    __slots__ = ('logger',)
+    
     def __init__(self, name: str = 'autocoder', log_file: Optional[str] = None):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
         
+        # Already configured by an earlier instance; don't open another log file
+        if self.logger.handlers:
+            return
+        
         # Create logs directory if it doesn't exist
         if not os.path.exists('logs'):
             os.makedirs('logs')
@@ -34,34 +44,42 @@ class AutocoderLogger:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        # Add handlers if they don't exist
-        if not self.logger.handlers:
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+        # Batch file writes; logging.shutdown flushes what is left at exit
+        buffered_handler = logging.handlers.MemoryHandler(
+            _FILE_BUFFER_RECORDS,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
+        buffered_handler.setLevel(logging.DEBUG)
+        
+        self.logger.addHandler(buffered_handler)
+        self.logger.addHandler(console_handler)
     
-    def info(self, message: str) -> None:
-        """Log info message."""
-        self.logger.info(message)
+    def info(self, message: str, *args) -> None:
+        """Log info message, formatting any args lazily."""
+        self.logger.info(message, *args)
     
-    def error(self, message: str) -> None:
-        """Log error message."""
-        self.logger.error(message)
+    def error(self, message: str, *args) -> None:
+        """Log error message, formatting any args lazily."""
+        self.logger.error(message, *args)
     
-    def warning(self, message: str) -> None:
-        """Log warning message."""
-        self.logger.warning(message)
+    def warning(self, message: str, *args) -> None:
+        """Log warning message, formatting any args lazily."""
+        self.logger.warning(message, *args)
     
-    def debug(self, message: str) -> None:
-        """Log debug message."""
-        self.logger.debug(message)
+    def debug(self, message: str, *args) -> None:
+        """Log debug message, formatting any args lazily."""
+        self.logger.debug(message, *args)
     
     def log_plan_update(self, update_type: str, details: str) -> None:
         """Log plan-specific updates."""
         self.info(f"PLAN_UPDATE - {update_type}: {details}")
     
-    def log_agent_action(self, agent: str, action: str, details: str) -> None:
-        """Log agent-specific actions."""
-        self.info(f"AGENT_ACTION - {agent} - {action}: {details}")
+    def log_agent_action(self, agent: str, action: str, details: str, *args) -> None:
+        """Log agent-specific actions; args are %-formatted into details only if emitted."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info(f"AGENT_ACTION - {agent} - {action}: {details}", *args)
 
 # Global logger instance
 logger = AutocoderLogger()
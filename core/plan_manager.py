@@ -1,6 +1,10 @@
 import os
+import re
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+
+# Start of a "## " section header line
+_SECTION_RE = re.compile(r'^## ', re.MULTILINE)
 
 class PlanManager:
     def __init__(self, plan_file: str = 'planfile.txt'):
@@ -8,9 +12,46 @@ class PlanManager:
         self.plan_file = plan_file
         if not os.path.exists(self.plan_file):
             self._initialize_plan()
-        self.plan_content = ""
+        # Plan text is indexed by section: text before the first header, then each section's
+        # chunks after its "## " marker ending with the blank lines before the next header,
+        # with section names mapped to their first index
+        self._preamble = ""
+        self._sections: List[List[str]] = []
+        self._index: Dict[str, int] = {}
+        self._content: Optional[str] = ""
         self.load_plan()
 
+    @property
+    def plan_content(self) -> str:
+        """Full plan text, rebuilt from the section index after changes."""
+        if self._content is None:
+            self._content = self._preamble + "".join("## " + "".join(chunks) for chunks in self._sections)
+        return self._content
+
+    @plan_content.setter
+    def plan_content(self, text: str) -> None:
+        self._preamble, *pieces = _SECTION_RE.split(text)
+        self._sections = []
+        self._index = {}
+        for piece in pieces:
+            body = piece.rstrip('\n')
+            separator = piece[len(body):]
+            if separator:
+                body, separator = body + '\n', separator[1:]
+            self._index.setdefault(piece.split('\n', 1)[0].strip(), len(self._sections))
+            self._sections.append([body, separator])
+        self._content = text
+
+    def _add_section(self, piece: str) -> None:
+        """Append a section after a blank line; piece is its text after the "## " marker."""
+        if self._sections:
+            self._sections[-1][-1] += "\n"
+        else:
+            self._preamble += "\n"
+        self._index.setdefault(piece.split('\n', 1)[0].strip(), len(self._sections))
+        self._sections.append([piece, ""])
+        self._content = None
+
     def _initialize_plan(self) -> None:
         """Create initial plan file with project structure."""
         initial_content = """# Plan File for Autocoder
@@ -82,49 +123,31 @@ Module 1: Core Infrastructure & Plan Management - ACTIVE
             # Update specific section
             self._update_section(section, update_text, timestamp)
         else:
-            # Add to update log
-            update_entry = f"\n## Update [{timestamp}]\n{update_text}\n"
-            
-            # Find the Update Log section and append
-            if "## Update Log" in self.plan_content:
-                log_index = self.plan_content.find("## Update Log")
-                log_end = len(self.plan_content)
-                
-                # Insert before the end
-                self.plan_content = (
-                    self.plan_content[:log_end] + 
-                    f"- [{timestamp}] {update_text}\n"
-                )
+            # Append to the Update Log section itself, wherever it is in the plan
+            entry = f"- [{timestamp}] {update_text}\n"
+            if "Update Log" in self._index:
+                chunks = self._sections[self._index["Update Log"]]
+                if not chunks[-2].endswith("\n"):
+                    entry = "\n" + entry
+                chunks.insert(-1, entry)
+                self._content = None
             else:
                 # Add new update log section
-                self.plan_content += f"\n## Update Log\n- [{timestamp}] {update_text}\n"
+                self._add_section(f"Update Log\n{entry}")
         
         self.save_plan()
 
     def _update_section(self, section: str, content: str, timestamp: str) -> None:
         """Update a specific section of the plan."""
-        section_header = f"## {section}"
-        if section_header in self.plan_content:
-            # Find section boundaries
-            start_idx = self.plan_content.find(section_header)
-            next_section = self.plan_content.find("\n## ", start_idx + 1)
-            
-            if next_section == -1:
-                # Last section
-                self.plan_content = (
-                    self.plan_content[:start_idx + len(section_header)] +
-                    f"\n{content}\n\n*Updated: {timestamp}*\n"
-                )
-            else:
-                # Middle section
-                self.plan_content = (
-                    self.plan_content[:start_idx + len(section_header)] +
-                    f"\n{content}\n\n*Updated: {timestamp}*\n" +
-                    self.plan_content[next_section:]
-                )
+        if section in self._index:
+            i = self._index[section]
+            # Sections followed by another keep a blank line before the next header
+            separator = "\n" if i < len(self._sections) - 1 else ""
+            self._sections[i] = [f"{section}\n{content}\n\n*Updated: {timestamp}*\n", separator]
+            self._content = None
         else:
             # Add new section
-            self.plan_content += f"\n## {section}\n{content}\n\n*Created: {timestamp}*\n"
+            self._add_section(f"{section}\n{content}\n\n*Created: {timestamp}*\n")
 
     def get_plan(self) -> str:
         """Return current plan content."""
@@ -132,16 +155,14 @@ Module 1: Core Infrastructure & Plan Management - ACTIVE
 
     def get_section(self, section: str) -> Optional[str]:
         """Extract specific section from plan."""
-        section_header = f"## {section}"
-        if section_header in self.plan_content:
-            start_idx = self.plan_content.find(section_header)
-            next_section = self.plan_content.find("\n## ", start_idx + 1)
-            
-            if next_section == -1:
-                return self.plan_content[start_idx:]
-            else:
-                return self.plan_content[start_idx:next_section]
-        return None
+        if section not in self._index:
+            return None
+        i = self._index[section]
+        text = "## " + "".join(self._sections[i])
+        # Sections followed by another end before the newline that precedes the next header
+        if i < len(self._sections) - 1:
+            text = text[:-1]
+        return text
 
     def mark_module_complete(self, module_number: int, module_name: str) -> None:
         """Mark a module as complete in the plan."""
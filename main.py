@@ -49,7 +49,7 @@ def main():
                     cli.display_projects(projects)
                     continue
                 elif user_input.lower() == 'history':
-                    cli.display_history(cli.history[-10:])
+                    cli.display_history(cli.recent_history(10))
                     continue
                 elif user_input.lower() == 'clear':
                     cli.history.clear()
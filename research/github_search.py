@@ -3,6 +3,7 @@ from typing import List, Dict, Optional
 import time
 
 from core import config, logger
+from .http_session import REQUEST_TIMEOUT, create_session
 
 class GitHubSearcher:
     """GitHub API integration for repository searches."""
@@ -19,9 +20,12 @@ class GitHubSearcher:
             logger.info("GitHub API initialized with authentication")
         else:
             logger.warning("GitHub API initialized without authentication (rate limited)")
+        
+        # Reuse connections across searches; headers are set once on the session
+        self.session = create_session(self.headers)
 
-    def search_repositories(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search GitHub repositories by query."""
+    def search_repositories(self, query: str, limit: int = 10, raise_errors: bool = False) -> List[Dict]:
+        """Search GitHub repositories by query; with raise_errors, failures raise instead of returning []."""
         try:
             # Build search query
             search_url = f"{self.base_url}/search/repositories"
@@ -32,11 +36,12 @@ class GitHubSearcher:
                 "per_page": min(limit, 100)
             }
             
-            response = requests.get(search_url, headers=self.headers, params=params)
+            response = self.session.get(search_url, params=params, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 403:
                 logger.error("GitHub API rate limit exceeded")
-                return []
+                if not raise_errors:
+                    return []
             
             response.raise_for_status()
             data = response.json()
@@ -59,16 +64,20 @@ class GitHubSearcher:
             
         except requests.RequestException as e:
             logger.error(f"GitHub API request failed: {e}")
+            if raise_errors:
+                raise
             return []
         except Exception as e:
             logger.error(f"GitHub search failed: {e}")
+            if raise_errors:
+                raise
             return []
 
     def get_repository_details(self, owner: str, repo: str) -> Optional[Dict]:
         """Get detailed information about a specific repository."""
         try:
             url = f"{self.base_url}/repos/{owner}/{repo}"
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
             repo_data = response.json()
@@ -0,0 +1,19 @@
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout applied to every research request
+REQUEST_TIMEOUT = (5, 30)
+
+def create_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Keep-alive session with a small connection pool and retries on gateway errors."""
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+    ))
+    return session
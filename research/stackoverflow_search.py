@@ -4,6 +4,7 @@ import time
 from urllib.parse import quote
 
 from core import logger
+from .http_session import REQUEST_TIMEOUT, create_session
 
 class StackOverflowSearcher:
     """Stack Overflow API integration for searching questions and answers."""
@@ -11,9 +12,11 @@ class StackOverflowSearcher:
     def __init__(self):
         self.base_url = "https://api.stackexchange.com/2.3"
         self.site = "stackoverflow"
+        # Reuse connections across searches
+        self.session = create_session()
 
-    def search_questions(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search Stack Overflow questions by query."""
+    def search_questions(self, query: str, limit: int = 10, raise_errors: bool = False) -> List[Dict]:
+        """Search Stack Overflow questions by query; with raise_errors, failures raise instead of returning []."""
         try:
             # Build search URL
             search_url = f"{self.base_url}/search/advanced"
@@ -25,7 +28,7 @@ class StackOverflowSearcher:
                 "pagesize": min(limit, 100)
             }
             
-            response = requests.get(search_url, params=params)
+            response = self.session.get(search_url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
@@ -47,9 +50,13 @@ class StackOverflowSearcher:
             
         except requests.RequestException as e:
             logger.error(f"Stack Overflow API request failed: {e}")
+            if raise_errors:
+                raise
             return []
         except Exception as e:
             logger.error(f"Stack Overflow search failed: {e}")
+            if raise_errors:
+                raise
             return []
 
     def search_by_tags(self, tags: List[str], limit: int = 5) -> List[Dict]:
@@ -64,7 +71,7 @@ class StackOverflowSearcher:
                 "pagesize": min(limit, 100)
             }
             
-            response = requests.get(search_url, params=params)
+            response = self.session.get(search_url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             
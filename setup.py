@@ -58,9 +58,12 @@ def create_directories():
     print("📁 Creating directories...")
     
     directories = ["logs", "projects", "temp"]
+    # One directory listing instead of a stat per directory
+    existing = {entry.name for entry in os.scandir('.') if entry.is_dir()}
     
     for directory in directories:
-        Path(directory).mkdir(exist_ok=True)
+        if directory not in existing:
+            Path(directory).mkdir()
         print(f"   ✅ {directory}/")
     
     return True
@@ -14,18 +14,18 @@ from rich.prompt import Prompt, Confirm
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.syntax import Syntax
 from rich.markdown import Markdown
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 
-class TerminalInterface:
-    """Simple terminal interface for Autocoder."""
-    
-    def __init__(self):
-        self.console = Console()
-        self.history = []
-        
-    def display_welcome(self):
-        """Display welcome message."""
-        welcome_text = """
+# History lines kept for the session (a user line and a system line per interaction)
+_HISTORY_LIMIT = 100
+
+# Static markdown for the welcome and help panels
+_WELCOME_TEXT = """
 # 🤖 **AUTOCODER - AI CODING ASSISTANT**
 
 **Terminal-First AI Development Tool**
@@ -36,13 +36,77 @@ class TerminalInterface:
 
 **Commands**: `help` | `create <description>` | `run <project>` | `debug <project>` | `list` | `status` | `quit`
         """
+
+_HELP_TEXT = """
+# 📖 **AUTOCODER COMMANDS**
+
+## **Core Commands**
+- `create <description>` - Create a new project from description
+- `run <project>` - Execute a project
+- `debug <project>` - Debug and fix project issues
+- `list` - List all available projects
+- `status` - Show system status and configuration
+
+## **Utility Commands**
+- `help` - Show this help message
+- `history` - View conversation history
+- `clear` - Clear conversation history
+- `quit` - Exit the program
+
+## **Examples**
+```
+create Python web scraper for news articles
+create React todo app with state management
+create FastAPI REST API with authentication
+run my_calculator_project
+debug my_web_scraper
+list
+status
+```
+        """
+
+@lru_cache(maxsize=None)
+def _welcome_panel() -> Panel:
+    """Welcome panel, parsed from markdown once."""
+    return Panel(
+        Markdown(_WELCOME_TEXT),
+        title="🚀 Welcome to Autocoder",
+        border_style="blue",
+        padding=(1, 2)
+    )
+
+@lru_cache(maxsize=None)
+def _help_panel() -> Panel:
+    """Help panel, parsed from markdown once."""
+    return Panel(
+        Markdown(_HELP_TEXT),
+        title="📖 Help",
+        border_style="green"
+    )
+
+@lru_cache(maxsize=32)
+def _lexer(language: str):
+    """Pygments lexer for a language, or the name itself for rich to fall back on."""
+    try:
+        return get_lexer_by_name(language)
+    except ClassNotFound:
+        return language
+
+@lru_cache(maxsize=None)
+def _syntax_theme(name: str):
+    """Resolved syntax highlighting theme."""
+    return Syntax.get_theme(name)
+
+class TerminalInterface:
+    """Simple terminal interface for Autocoder."""
+    
+    def __init__(self):
+        self.console = Console()
+        self.history = deque(maxlen=_HISTORY_LIMIT)
         
-        self.console.print(Panel(
-            Markdown(welcome_text),
-            title="🚀 Welcome to Autocoder",
-            border_style="blue",
-            padding=(1, 2)
-        ))
+    def display_welcome(self):
+        """Display welcome message."""
+        self.console.print(_welcome_panel())
     
     def display_loading(self, message: str):
         """Display loading message."""
@@ -76,39 +140,7 @@ class TerminalInterface:
     
     def display_help(self):
         """Display help information."""
-        help_text = """
-# 📖 **AUTOCODER COMMANDS**
-
-## **Core Commands**
-- `create <description>` - Create a new project from description
-- `run <project>` - Execute a project
-- `debug <project>` - Debug and fix project issues
-- `list` - List all available projects
-- `status` - Show system status and configuration
-
-## **Utility Commands**
-- `help` - Show this help message
-- `history` - View conversation history
-- `clear` - Clear conversation history
-- `quit` - Exit the program
-
-## **Examples**
-```
-create Python web scraper for news articles
-create React todo app with state management
-create FastAPI REST API with authentication
-run my_calculator_project
-debug my_web_scraper
-list
-status
-```
-        """
-        
-        self.console.print(Panel(
-            Markdown(help_text),
-            title="📖 Help",
-            border_style="green"
-        ))
+        self.console.print(_help_panel())
     
     def display_status(self, config_status: dict, plan_content: str = ""):
         """Display system status."""
@@ -161,7 +193,7 @@ status
     
     def display_code(self, code: str, language: str = "python"):
         """Display code with syntax highlighting."""
-        syntax = Syntax(code, language, theme="monokai", line_numbers=True)
+        syntax = Syntax(code, _lexer(language), theme=_syntax_theme("monokai"), line_numbers=True)
         self.console.print(Panel(
             syntax,
             title=f"💻 Generated Code ({language})",
@@ -201,6 +233,10 @@ status
             border_style="blue"
         ))
     
+    def recent_history(self, count: int = 10) -> list:
+        """Return the last count history lines, oldest first."""
+        return list(islice(self.history, max(0, len(self.history) - count), None))
+    
     def confirm_action(self, message: str) -> bool:
         """Ask for user confirmation."""
         return Confirm.ask(message)